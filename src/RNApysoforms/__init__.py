@@ -1,16 +1,47 @@
+import importlib
+import sys
+import types
+
 # Import necessary functions from local modules
 from .shorten_gaps import shorten_gaps  # Function to shorten gaps in data
 from .to_intron import to_intron        # Function to convert exons to introns
-from .set_axis import set_axis          # Function to set axis properties for plot
 from .read_gtf import read_gtf          # Function to read and parse GTF (Gene Transfer Format) files
 from .read_expression_matrix import read_expression_matrix # Function to load counts matrix
 from .gene_filtering import gene_filtering # Function to filter by gene_name 
 from .calculate_exon_number import calculate_exon_number ## Function to calculate exon number if missing
-from .make_plot import make_plot
-from .make_traces import make_traces
+
+# Plotting functions depend on Plotly, so they are only imported the first time they are accessed
+_lazy_imports = {
+    "set_axis": ".set_axis",        # Function to set axis properties for plot
+    "make_plot": ".make_plot",      # Function to assemble traces into a figure
+    "make_traces": ".make_traces",  # Function to create transcript structure and expression traces
+}
+
+
+class _LazyModule(types.ModuleType):
+    def __setattr__(self, name, value):
+        # Importing a plotting submodule binds it on the package; keep the function of the same name instead
+        if name in _lazy_imports and isinstance(value, types.ModuleType):
+            value = getattr(value, name)
+        super().__setattr__(name, value)
+
+
+def __getattr__(name):
+    # Lazily import plotting functions on first access (PEP 562)
+    if name in _lazy_imports:
+        function = getattr(importlib.import_module(_lazy_imports[name], __name__), name)
+        globals()[name] = function
+        return function
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_lazy_imports))
+
+
+sys.modules[__name__].__class__ = _LazyModule
 
 # Define the public API of this module by specifying which functions to expose when imported
-__all__ = ['shorten_gaps', 'to_intron', 'set_axis', "read_gtf", "make_transcript_structure_traces",
-           "read_expression_matrix", "gene_filtering", "calculate_exon_number", "make_transcript_expression_traces",
+__all__ = ['shorten_gaps', 'to_intron', 'set_axis', "read_gtf", "make_traces",
+           "read_expression_matrix", "gene_filtering", "calculate_exon_number",
            "make_plot"]
-
@@ -1,8 +1,12 @@
 import polars as pl
 import warnings
+import contextlib
 from typing import Union
 from RNApysoforms.utils import check_df
 
+# Polars >= 1.32 shares categories globally and deprecates the string cache, so it is only needed on older versions
+_string_cache = contextlib.nullcontext if hasattr(pl, "Categories") else pl.StringCache
+
 def gene_filtering(
     target_gene: str,
     annotation: pl.DataFrame,
@@ -117,6 +121,11 @@ def gene_filtering(
     - If `keep_top_expressed_transcripts` is an integer, only the top N expressed transcripts are kept after ordering.
     - If `keep_top_expressed_transcripts` is 'all', all transcripts are kept.
     - If transcripts are present in the expression matrix but not in the annotation, they are silently ignored, and only overlapping transcripts are returned without a warning.
+    - Expression filtering and aggregation are built as lazy queries and collected together, so the expression matrix is only filtered once.
+    - When filtering many genes, casting `transcript_id_column` to `pl.Categorical` in both DataFrames beforehand makes the
+      transcript lookups cheaper. String and Categorical transcript identifiers can be mixed; the outputs keep the input dtypes.
+      On Polars versions older than 1.32, cast both DataFrames inside the same `pl.StringCache()` block (e.g., right after
+      `read_gtf` and `read_expression_matrix`) so their categories are shared; the matching itself always runs under a string cache.
 
     """
     # Check if 'annotation' is a Polars DataFrame
@@ -129,13 +138,6 @@ def gene_filtering(
     # Ensure required columns are present in the annotation DataFrame
     check_df(annotation, [gene_id_column, transcript_id_column])
 
-    # Filter annotation based on 'target_gene'
-    filtered_annotation = annotation.filter(pl.col(gene_id_column) == target_gene)
-
-    # Check if filtered_annotation is empty and raise an error if true
-    if filtered_annotation.is_empty():
-        raise ValueError(f"No annotation found for gene: {target_gene} in the '{gene_id_column}' column")
-
     if expression_matrix is not None:
         # Check if 'expression_matrix' is a Polars DataFrame
         if not isinstance(expression_matrix, pl.DataFrame):
@@ -147,97 +149,171 @@ def gene_filtering(
         # Ensure required columns are present in the expression matrix
         check_df(expression_matrix, [transcript_id_column, expression_column])
 
-        # Filter expression_matrix to include only transcripts present in filtered_annotation
-        filtered_expression_matrix = expression_matrix.filter(
-            pl.col(transcript_id_column).is_in(filtered_annotation[transcript_id_column])
-        )
-
-        # If filtered expression matrix is empty, raise an error
-        if filtered_expression_matrix.is_empty():
+        # Validate 'keep_top_expressed_transcripts' before running any query
+        if order_by_expression and keep_top_expressed_transcripts != "all" and not (
+            isinstance(keep_top_expressed_transcripts, int) and keep_top_expressed_transcripts > 0
+        ):
             raise ValueError(
-                f"Expression matrix is empty after filtering. No matching '{transcript_id_column}' entries "
-                f"between expression matrix and annotation found for gene '{target_gene}'."
+                f"'keep_top_expressed_transcripts' must be 'all' or a positive integer, got {keep_top_expressed_transcripts}."
             )
 
-        # Get sets of transcripts in annotation and expression matrix
-        annotation_transcripts = set(filtered_annotation[transcript_id_column].unique())
-        expression_transcripts = set(filtered_expression_matrix[transcript_id_column].unique())
+    # Filter annotation based on 'target_gene'
+    filtered_annotation = annotation.filter(pl.col(gene_id_column) == target_gene)
 
-        # Identify transcripts present in annotation but missing in expression matrix
-        missing_in_expression = annotation_transcripts - expression_transcripts
+    # Check if filtered_annotation is empty and raise an error if true
+    if filtered_annotation.height == 0:
+        raise ValueError(f"No annotation found for gene: {target_gene} in the '{gene_id_column}' column")
 
-        # Transcripts in expression matrix but not in annotation are silently ignored
+    # If no expression_matrix is provided, return only the filtered annotation
+    if expression_matrix is None:
+        return filtered_annotation
 
-        # Warn about transcripts missing in the expression matrix
-        if missing_in_expression:
-            warnings.warn(
-                f"{len(missing_in_expression)} transcript(s) are present in the annotation but missing in the expression matrix. "
-                f"Missing transcripts: {', '.join(sorted(missing_in_expression))}. "
-                "Only transcripts present in both will be returned."
+    # Run the transcript matching under a shared string cache, so categorical transcript ids built in different
+    # frames can be compared directly without re-mapping their categories
+    with _string_cache():
+        # Transcript ids are cast to the dtype of the frame they are matched against, so transcript ids that were
+        # cast to pl.Categorical ahead of time are used as-is and only the small gene-level side is ever cast
+        annotation_tid_dtype = annotation.schema[transcript_id_column]
+        expression_tid_dtype = expression_matrix.schema[transcript_id_column]
+
+        # Lazily filter expression_matrix to include only transcripts present in the filtered annotation.
+        # A single gene has few transcripts, so a membership test against them is cheaper than a join
+        # that has to hash the whole expression matrix. The ids are passed as a single list value, as
+        # Polars deprecates membership tests against a collection of the same datatype.
+        expression_lf = expression_matrix.lazy().filter(
+            pl.col(transcript_id_column).is_in(
+                filtered_annotation[transcript_id_column].cast(expression_tid_dtype).implode()
             )
-
-        # Ensure both filtered_annotation and filtered_expression_matrix contain only common transcripts
-        common_transcripts = annotation_transcripts & expression_transcripts
-        filtered_annotation = filtered_annotation.filter(
-            pl.col(transcript_id_column).is_in(common_transcripts)
-        )
-        filtered_expression_matrix = filtered_expression_matrix.filter(
-            pl.col(transcript_id_column).is_in(common_transcripts)
         )
+        lazy_frames = [expression_lf]
 
         if order_by_expression:
-            # Aggregate expression data to compute total expression per transcript
-            aggregated_df = filtered_expression_matrix.group_by(transcript_id_column).agg(
-                pl.col(expression_column).sum().alias("total_expression")
+            # Aggregate expression data to compute total expression per transcript, sorted in descending order
+            sorted_transcripts_lf = (
+                expression_lf.group_by(transcript_id_column)
+                .agg(pl.col(expression_column).sum().alias("total_expression"))
+                .sort("total_expression", descending=True)
             )
 
-            # Sort transcripts by total expression in descending order
-            sorted_transcripts = aggregated_df.sort("total_expression", descending=True)
-
-            # Determine transcripts to keep based on 'keep_top_expressed_transcripts'
-            if isinstance(keep_top_expressed_transcripts, int) and keep_top_expressed_transcripts > 0:
-                # Keep only the top N expressed transcripts
-                if keep_top_expressed_transcripts < len(sorted_transcripts):
-                    transcripts_to_keep = sorted_transcripts.head(keep_top_expressed_transcripts)[transcript_id_column]
-                else:
-                    # If requested number exceeds available transcripts, keep all and issue a warning
-                    transcripts_to_keep = sorted_transcripts[transcript_id_column]
-                    warnings.warn(
-                        "The number specified in 'keep_top_expressed_transcripts' exceeds the total number of transcripts. "
-                        "All transcripts will be kept."
-                    )
-            elif keep_top_expressed_transcripts == "all":
-                # Keep all transcripts
-                transcripts_to_keep = sorted_transcripts[transcript_id_column]
-            else:
-                # Raise error if 'keep_top_expressed_transcripts' is invalid
-                raise ValueError(
-                    f"'keep_top_expressed_transcripts' must be 'all' or a positive integer, got {keep_top_expressed_transcripts}."
-                )
+            # Keep only the top N expressed transcripts within the same query
+            if keep_top_expressed_transcripts != "all":
+                sorted_transcripts_lf = sorted_transcripts_lf.slice(0, keep_top_expressed_transcripts)
 
-            # Filter annotation and expression matrix to include only the selected transcripts
-            filtered_annotation = filtered_annotation.filter(
-                pl.col(transcript_id_column).is_in(transcripts_to_keep)
-            )
-            filtered_expression_matrix = filtered_expression_matrix.filter(
-                pl.col(transcript_id_column).is_in(transcripts_to_keep)
+            lazy_frames.append(sorted_transcripts_lf)
+
+        # Collect all queries at once so the filtered expression matrix is only computed once
+        collected_frames = pl.collect_all(lazy_frames)
+        filtered_expression_matrix = collected_frames[0]
+
+        # If filtered expression matrix is empty, raise an error
+        if filtered_expression_matrix.height == 0:
+            raise ValueError(
+                f"Expression matrix is empty after filtering. No matching '{transcript_id_column}' entries "
+                f"between expression matrix and annotation found for gene '{target_gene}'."
             )
 
-            # Order annotation and expression matrix by total expression
+        # Identify transcripts present in annotation but missing in expression matrix
+        # (transcripts in expression matrix but not in annotation are silently ignored)
+        missing_in_expression = filtered_annotation.select(transcript_id_column).unique().join(
+            filtered_expression_matrix.select(pl.col(transcript_id_column).cast(annotation_tid_dtype)).unique(),
+            on=transcript_id_column,
+            how="anti"
+        )
+
+        # Number of missing transcripts, read once and reused below
+        n_missing = missing_in_expression.height
+
+        if n_missing > 0:
+            # Only build the (potentially long) warning message if it is not going to be discarded
+            if not _warning_is_ignored(UserWarning):
+                # Only list the first few missing transcripts (in sorted order) to keep the warning readable
+                max_listed = 20
+                missing_preview = ', '.join(
+                    missing_in_expression[transcript_id_column].bottom_k(max_listed).sort().to_list()
+                )
+                if n_missing > max_listed:
+                    missing_preview += f", ... ({n_missing - max_listed} more)"
+
+                # Warn about transcripts missing in the expression matrix
+                warnings.warn(
+                    f"{n_missing} transcript(s) are present in the annotation but missing in the expression matrix. "
+                    f"Missing transcripts: {missing_preview}. "
+                    "Only transcripts present in both will be returned."
+                )
+
+            # Ensure filtered_annotation contains only transcripts also present in the expression matrix
             filtered_annotation = filtered_annotation.join(
-                sorted_transcripts.select([transcript_id_column, "total_expression"]),
+                missing_in_expression,
                 on=transcript_id_column,
-                how="inner"
-            ).sort("total_expression", descending=True).drop("total_expression")
+                how="anti"
+            )
 
-            filtered_expression_matrix = filtered_expression_matrix.join(
-                sorted_transcripts.select([transcript_id_column, "total_expression"]),
-                on=transcript_id_column,
-                how="inner"
-            ).sort("total_expression", descending=True).drop("total_expression")
+        # Without ordering there is nothing left to do
+        if not order_by_expression:
+            return filtered_annotation, filtered_expression_matrix
+
+        # Transcripts sorted by total expression in descending order, limited to the top N if requested
+        sorted_transcripts = collected_frames[1]
+
+        # If requested number exceeds available transcripts, keep all and issue a warning
+        if keep_top_expressed_transcripts != "all" and keep_top_expressed_transcripts > sorted_transcripts.height:
+            warnings.warn(
+                "The number specified in 'keep_top_expressed_transcripts' exceeds the total number of transcripts. "
+                "All transcripts will be kept."
+            )
+
+        # Rank transcripts by total expression so both frames can be ordered by a compact integer key
+        rank_df = sorted_transcripts.with_row_index("rank").select([
+            pl.col(transcript_id_column),
+            pl.col("rank").cast(pl.Int32)
+        ])
+
+        # Order annotation and expression matrix by total expression. The inner join also drops transcripts
+        # outside the top N, since only the selected transcripts are ranked.
+        filtered_annotation = filtered_annotation.join(
+            rank_df.with_columns(pl.col(transcript_id_column).cast(annotation_tid_dtype)),
+            on=transcript_id_column,
+            how="inner"
+        ).sort("rank", maintain_order=True).drop("rank")
+
+        filtered_expression_matrix = filtered_expression_matrix.join(
+            rank_df,
+            on=transcript_id_column,
+            how="inner"
+        ).sort("rank", maintain_order=True).drop("rank")
 
         return filtered_annotation, filtered_expression_matrix
 
-    else:
-        # If no expression_matrix is provided, return only the filtered annotation
-        return filtered_annotation
+
+def _warning_is_ignored(category: type) -> bool:
+    """
+    Check whether a warning of the given category would be discarded by the active warning filters.
+
+    Parameters
+    ----------
+    category : type
+        The warning category that is about to be issued.
+
+    Returns
+    -------
+    bool
+        True if the first filter that applies to `category` is an unconditional 'ignore', False otherwise.
+
+    Notes
+    -----
+    - This function is used internally by `gene_filtering` to skip building warning messages that would never be shown.
+    - Filters restricted by message, module or line number cannot be resolved before the warning is issued, so they
+      are treated as not ignoring the warning.
+    """
+    for action, message, filter_category, module, lineno in warnings.filters:
+        # Skip filters that do not apply to this category
+        if not issubclass(category, filter_category):
+            continue
+
+        # A filter that depends on the message or the caller cannot be evaluated here
+        if message is not None or module is not None or lineno:
+            return False
+
+        return action == "ignore"
+
+    return False
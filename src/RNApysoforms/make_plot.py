@@ -1,9 +1,7 @@
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import polars as pl
-from typing import List, Optional
-from RNApysoforms.utils import check_df  # Ensure this is correctly imported
-from RNApysoforms import set_axis
+from typing import List
+import numpy as np
 
 def make_plot(
     traces: List[go.Trace],
@@ -121,8 +119,8 @@ def make_plot(
     -----
     - The function expects the last element of `traces` to be a dictionary (`y_dict`) mapping transcript identifiers to y-axis positions.
     - Traces are classified into transcript structure traces or expression data traces based on their content:
-        - Transcript traces are expected to be dictionaries (usually shapes or annotations).
-        - Expression traces are expected to be Plotly trace objects with a 'type' attribute (e.g., `go.Box`, `go.Violin`).
+        - Transcript traces are expected to be plain dictionaries (usually shapes or annotations).
+        - Any other trace is treated as an expression trace, i.e. a Plotly trace object (e.g., `go.Box`, `go.Violin`).
     - The function dynamically assigns traces to subplots and customizes axes and layout based on the type of data.
     - The y-axis is shared across subplots to align transcript structures with their corresponding expression data.
 
@@ -143,10 +141,8 @@ def make_plot(
         shared_yaxes=True,  # Share y-axes across all subplots to align data
     )
 
-    # Update the layout to change the font size of the subplot titles
-    fig.update_layout(
-        annotations=[dict(font=dict(size=subplot_title_font_size)) for annotation in fig['layout']['annotations']]
-    )
+    # Change the font size of the subplot titles
+    fig.update_annotations(font_size=subplot_title_font_size)
 
     # Apply the specified template for styling
     fig.update_layout(
@@ -162,74 +158,81 @@ def make_plot(
     # Classify traces into transcript or expression traces based on their content
     index = 1  # Start subplot index from 1
     for trace in full_trace_list:
-        if hasattr(trace[0], 'type'):
-            # If the trace has a 'type' attribute, it's an expression trace (e.g., go.Box, go.Violin)
-            expression_traces.extend(trace)
-            expression_indexes.append(index)
-        elif isinstance(trace[0], dict):
-            # If the trace is a dictionary, it's a transcript trace (e.g., shapes or annotations)
+        if type(trace[0]) is dict:
+            # If the trace is a plain dictionary, it's a transcript trace (e.g., shapes or annotations)
             transcript_traces.append(trace)
             transcript_indexes.append(index)
+        else:
+            # Otherwise it's a Plotly trace object, i.e. an expression trace (e.g., go.Box, go.Violin)
+            expression_traces.extend(trace)
+            expression_indexes.append(index)
         index += 1  # Increment subplot index
 
-    # Add all traces to their respective subplots
+    # Gather all traces together with their subplot positions
+    all_traces = []
+    all_cols = []
     for i, subplot_traces in enumerate(full_trace_list, start=1):
-        fig.add_traces(
-            subplot_traces,
-            rows=[1] * len(subplot_traces),
-            cols=[i] * len(subplot_traces)
-        )
+        all_traces.extend(subplot_traces)
+        all_cols.extend([i] * len(subplot_traces))
+
+    # Add all traces to their respective subplots in a single call
+    fig.add_traces(
+        all_traces,
+        rows=[1] * len(all_traces),
+        cols=all_cols
+    )
+
+    # Compute y-axis tick values, labels and range once for all subplots, as arrays Plotly can take directly
+    y_tickvals = np.fromiter(y_dict.values(), dtype=np.int32, count=len(y_dict))
+    y_ticktext = np.array(list(y_dict.keys()), dtype=object)
+    y_range = [-0.8, (len(y_dict) - 0.2)]  # Align expression plots with transcript plots
+
+    # Collect axis settings for every subplot so they can be applied in a single layout update
+    axes_layout = {}
 
     # Customize axes and layout for transcript structure subplots
     for i in transcript_indexes:
+        axis_suffix = str(i) if i > 1 else ""
         # Customize x-axes for transcript structure plots (hide tick labels)
-        fig.update_xaxes(
+        axes_layout[f"xaxis{axis_suffix}"] = dict(
             showticklabels=False,
             title="",
-            row=1,
-            col=i,
             showgrid=horz_grid_transcript_structure_plot
         )
         # Customize y-axes for transcript structure plots (show transcript labels)
-        fig.update_yaxes(
+        axes_layout[f"yaxis{axis_suffix}"] = dict(
             showticklabels=False,
-            tickvals=list(y_dict.values()),
-            ticktext=list(y_dict.keys()),
+            tickvals=y_tickvals,
+            ticktext=y_ticktext,
             tickfont=dict(size=10, family='DejaVu Sans', color='black'),
             title="",  # Optional title for y-axis
-            row=1,
-            col=i,
             showgrid=vert_grid_transcript_structure_plot
         )
 
     # Customize axes and layout for expression data subplots
     for i in expression_indexes:
+        axis_suffix = str(i) if i > 1 else ""
         # Customize x-axes for expression plots (show tick labels)
-        fig.update_xaxes(
+        axes_layout[f"xaxis{axis_suffix}"] = dict(
             showticklabels=True,
             title="",  # Optional title for x-axis
-            row=1,
-            col=i,
             showgrid=horz_grid_expression_plot
         )
         # Customize y-axes for expression plots (hide tick labels)
-        fig.update_yaxes(
+        axes_layout[f"yaxis{axis_suffix}"] = dict(
             showticklabels=False,
-            tickvals=list(y_dict.values()),
-            ticktext=list(y_dict.keys()),
+            tickvals=y_tickvals,
+            ticktext=y_ticktext,
             ticks='',  # Hide ticks
-            row=1,
-            col=i,
-            range=[-0.8, (len(y_dict) - 0.2)],  # Adjust y-axis range to align with transcript plots
+            range=y_range,  # Adjust y-axis range to align with transcript plots
             showgrid=vert_grid_expression_plot
         )
 
     # Ensure the first subplot's y-axis shows tick labels (transcript identifiers)
-    fig.update_yaxes(
-        showticklabels=True,
-        row=1,
-        col=1
-    )
+    axes_layout.setdefault("yaxis", {})["showticklabels"] = True
+
+    # Apply all subplot axis settings at once
+    fig.update_layout(**axes_layout)
 
     # Update overall layout settings
     fig.update_layout(
@@ -248,7 +251,7 @@ def make_plot(
         violingroupgap=boxgroupgap,
         violingap=boxgap,
         yaxis=dict(
-            range=[-0.8, (len(y_dict) - 0.2)],
+            range=y_range,
             tickfont=dict(size=yaxis_font_size)
         ),
         legend=dict(font=dict(size=legend_font_size)),
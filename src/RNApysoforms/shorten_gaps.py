@@ -1,9 +1,15 @@
 import polars as pl
-import plotly.graph_objects as go
+import numpy as np
+from collections import OrderedDict
 from typing import List, Union
 from RNApysoforms.to_intron import to_intron
 from RNApysoforms.utils import check_df
 
+# Results of recent shorten_gaps calls, keyed on the content of their inputs, so that plotting the same
+# locus repeatedly (e.g. with different styling) does not recompute the shortened coordinates
+_SHORTEN_GAPS_CACHE_SIZE = 64
+_shorten_gaps_cache = OrderedDict()
+
 
 def shorten_gaps(
     annotation: pl.DataFrame, 
@@ -70,37 +76,84 @@ def shorten_gaps(
     - The input DataFrame must contain columns 'start', 'end', 'type', 'strand', 'seqnames', and the column specified by `transcript_id_column`.
     - The function resizes gaps at the start of transcripts and rescale the entire transcript structure for improved visualization.
     - Rescaling is applied after the gaps have been shortened to maintain the relative structure of transcripts.
+    - Results of the last 64 distinct calls are cached, so calling the function again with the same annotation and 
+      arguments returns the previous result without recomputing it.
     """
     
     # Check if annotation is a Polars DataFrame
     if not isinstance(annotation, pl.DataFrame):
         raise TypeError(
             f"Expected annotation to be of type pl.DataFrame, got {type(annotation)}" +
-            "\n You can use polars_df = pandas_df.from_pandas() to convert a pandas df into a polars df"
+            "\n You can use polars_df = pl.from_pandas(pandas_df) to convert a pandas df into a polars df"
         )
 
     # Validate the input DataFrame to ensure required columns are present
     check_df(annotation, ["start", "end", "type", "strand", "seqnames", transcript_id_column])
 
+    # Look up the result of a previous call on the same annotation content, schema and arguments. The row
+    # hashes only narrow the lookup down, and they (like DataFrame.equals) ignore integer widths, so the
+    # cached annotation is compared in full, schema included, to rule out hash collisions and dtype mismatches.
+    # The entry is popped and reinserted rather than moved, so a concurrent eviction cannot raise a KeyError.
+    cache_key = (hash(annotation.hash_rows().to_numpy().tobytes()), tuple(annotation.schema.items()),
+                 transcript_id_column, target_gap_width)
+    cached = _shorten_gaps_cache.pop(cache_key, None)
+    if cached is not None and cached[0].schema == annotation.schema and cached[0].equals(annotation):
+        _shorten_gaps_cache[cache_key] = cached
+        return cached[1].clone()
+
+    rescaled_tx = _shorten_core(annotation, transcript_id_column, target_gap_width)
+
+    # Store the result, evicting the least recently used entries once the cache is full
+    _shorten_gaps_cache[cache_key] = (annotation.clone(), rescaled_tx.clone())
+    while len(_shorten_gaps_cache) > _SHORTEN_GAPS_CACHE_SIZE:
+        try:
+            _shorten_gaps_cache.popitem(last=False)
+        except KeyError:  # Emptied by another thread in the meantime
+            break
+
+    return rescaled_tx  # Return the rescaled transcript DataFrame
+
+
+def _shorten_core(annotation: pl.DataFrame, transcript_id_column: str, target_gap_width: int) -> pl.DataFrame:
+    """
+    Computes the shortened gaps and rescaled coordinates for a validated annotation.
+    
+    Parameters
+    ----------
+    annotation : pl.DataFrame
+        DataFrame containing exon data and optionally CDS and/or intron data, already validated by `shorten_gaps`.
+    transcript_id_column : str
+        Column used to group transcripts (e.g., 'transcript_id').
+    target_gap_width : int
+        The maximum allowed width for the gaps.
+    
+    Returns
+    -------
+    pl.DataFrame
+        DataFrame with shortened intron gaps and rescaled coordinates for exons, introns, and CDS regions.
+    
+    Examples
+    --------
+    >>> rescaled_tx = _shorten_core(annotation_df, "transcript_id", 100)
+    
+    Notes
+    -----
+    - This is the uncached body of `shorten_gaps`; see its documentation for details.
+    """
+    # Split the annotation by feature type in a single pass
+    features = annotation.partition_by("type", as_dict=True)
+
     # Check if there are intron entries in the annotation data
-    if "intron" in annotation["type"].unique().to_list():
-        introns = annotation.filter(pl.col("type") == "intron")  # Separate intron data
-    else:
+    if ("intron",) not in features:
         annotation = to_intron(annotation=annotation, transcript_id_column=transcript_id_column)  # Add intron annotations
-        introns = annotation.filter(pl.col("type") == "intron")  # Separate intron data
+        features = annotation.partition_by("type", as_dict=True)
+    introns = features.get(("intron",), annotation.clear())  # Separate intron data
 
-    # Check if there are CDS entries in the annotation data
-    if "CDS" in annotation["type"].unique().to_list():
-        cds = annotation.filter(pl.col("type") == "CDS")  # Separate CDS data
-    else:
-        cds = None  # No CDS entries in the data
+    # Separate CDS data if there are CDS entries in the annotation data
+    cds = features.get(("CDS",))
 
     # Separate exons from the rest of the annotation data
-    exons = annotation.filter(pl.col("type") == "exon")
-
-    # Ensure the 'type' column in exons and introns is set correctly
-    exons = _get_type(exons, "exons")  # Mark the type as 'exon'
-    introns = _get_type(introns, "introns")  # Mark the type as 'intron'
+    exons = features.get(("exon",), annotation.clear())
 
     # Adjust intron positions to avoid overlap with exons
     introns = introns.with_columns([
@@ -138,72 +191,21 @@ def shorten_gaps(
         # Combine the rescaled CDS data into the final DataFrame
         rescaled_tx = pl.concat([rescaled_tx, rescaled_cds])
 
-    # Sort the DataFrame by start and end position position
-    rescaled_tx = rescaled_tx.sort(by=['start', 'end'])
-
-    ## Return transcripts in original order they were given
+    ## Return transcripts in original order they were given, sorted by start and end position within each
+    ## transcript. Both orderings are applied in a single sort on the combined key.
     original_order = annotation[transcript_id_column].unique(maintain_order=True).to_list()
     order_mapping = {transcript: index for index, transcript in enumerate(original_order)}
+    ## Selecting the final columns puts everything in good order and drops the temporary order key.
+    final_columns = annotation.columns + ["rescaled_start", "rescaled_end"]
     rescaled_tx = (rescaled_tx
                 .with_columns(pl.col(transcript_id_column).replace(order_mapping).alias("order"))
-                .sort("order")
-                .drop("order"))
-
-
-    ## Pass final column so everything is in good order
-    final_columns = annotation.columns + ["rescaled_start", "rescaled_end"]
-    rescaled_tx = rescaled_tx[final_columns].clone()
+                .sort(["order", "start", "end"], maintain_order=True)
+                .select(final_columns))
 
 
     return rescaled_tx  # Return the rescaled transcript DataFrame
 
 
-def _get_type(df: pl.DataFrame, df_type: str) -> pl.DataFrame:
-    """
-    Ensures that the DataFrame contains the correct 'type' column.
-    
-    Parameters
-    ----------
-    df : pl.DataFrame
-        DataFrame containing exons or introns.
-    df_type : str
-        Either 'exons' or 'introns', which sets the 'type' column appropriately.
-    
-    Returns
-    -------
-    pl.DataFrame
-        DataFrame with the 'type' column set correctly.
-    
-    Raises
-    ------
-    ValueError
-        If `df_type` is not 'exons' or 'introns'.
-    
-    Examples
-    --------
-    >>> exons = _get_type(exons_df, "exons")
-    >>> introns = _get_type(introns_df, "introns")
-    
-    Notes
-    -----
-    - If the 'type' column does not exist in the input DataFrame, it is added with the appropriate value based on `df_type`.
-    - If the 'type' column exists and `df_type` is 'introns', the function filters the DataFrame to include only intron entries.
-    """
-    # Validate df_type
-    if df_type not in ["exons", "introns"]:
-        raise ValueError("df_type must be either 'exons' or 'introns'")
-    
-    # If the 'type' column doesn't exist, add it with the appropriate value
-    if 'type' not in df.schema:
-        return df.with_columns(
-            pl.lit('exon' if df_type == 'exons' else 'intron').alias('type')
-        )
-    # If 'type' exists and df_type is 'introns', ensure the type is correctly set to 'intron'
-    elif df_type == 'introns':
-        df = df.filter(pl.col('type') == 'intron')
-    return df
-
-
 def _get_gaps(exons: pl.DataFrame) -> pl.DataFrame:
     """
     Identifies gaps between exons within the same chromosome and strand.
@@ -230,7 +232,8 @@ def _get_gaps(exons: pl.DataFrame) -> pl.DataFrame:
     Notes
     -----
     - All exons must be from a single chromosome and strand to accurately identify gaps.
-    - The function sorts exons by their start positions and computes the gaps between consecutive exons.
+    - The function sorts exons by their start positions, merges overlapping exons into blocks and computes the gaps between consecutive blocks.
+    - The merge runs on NumPy arrays, so the returned gaps are sorted by start position and non-overlapping.
     """
     # Ensure all exons are from a single chromosome and strand
     seqnames_unique = exons["seqnames"].n_unique()
@@ -238,49 +241,34 @@ def _get_gaps(exons: pl.DataFrame) -> pl.DataFrame:
     if seqnames_unique != 1 or strand_unique != 1:
         raise ValueError("Exons must be from a single chromosome and strand")
 
-    # Sort exons by start position
-    exons_sorted = exons.sort('start')
-
-    # Compute cumulative maximum of 'end' shifted by 1 to identify gaps
-    exons_with_cummax = exons_sorted.with_columns([
-        pl.col('end').cum_max().shift(1).fill_null(0).alias('cummax_end')
-    ])
-
-    # Determine if a new group starts (i.e., no overlap with previous exons)
-    exons_with_cummax = exons_with_cummax.with_columns([
-        (pl.col('start') > pl.col('cummax_end')).alias('is_new_group')
-    ])
-
-    # Compute group_id as cumulative sum of 'is_new_group'
-    exons_with_cummax = exons_with_cummax.with_columns([
-        pl.col('is_new_group').cast(pl.Int64).cum_sum().alias('group_id')
-    ])
-
-    # Merge exons within each group to identify continuous blocks
-    merged_exons = exons_with_cummax.group_by('group_id').agg([
-        pl.col('start').min().alias('start'),
-        pl.col('end').max().alias('end')
-    ])
-
-    # Sort merged exons by 'start'
-    merged_exons = merged_exons.sort('start')
-
-    # Compute 'prev_end' as the shifted 'end' to identify gaps
-    merged_exons = merged_exons.with_columns([
-        pl.col('end').shift(1).alias('prev_end')
-    ])
-
-    # Compute gap start and end positions
-    merged_exons = merged_exons.with_columns([
-        (pl.col('prev_end') + 1).alias('gap_start'),
-        (pl.col('start') - 1).alias('gap_end')
-    ])
-
-    # Filter valid gaps where 'gap_start' is less than or equal to 'gap_end'
-    gaps = merged_exons.filter(pl.col('gap_start') <= pl.col('gap_end')).select([
-        pl.col('gap_start').alias('start'),
-        pl.col('gap_end').alias('end')
-    ])
+    # Sort exon coordinates by start position
+    exon_starts = exons["start"].to_numpy()
+    exon_ends = exons["end"].to_numpy()
+    start_order = np.argsort(exon_starts, kind="stable")
+    exon_starts = exon_starts[start_order]
+    exon_ends = exon_ends[start_order]
+
+    # Compute cumulative maximum of 'end' to identify gaps
+    cummax_ends = np.maximum.accumulate(exon_ends)
+
+    # Determine where a new block starts (i.e., no overlap with previous exons)
+    is_new_block = np.concatenate(([True], exon_starts[1:] > cummax_ends[:-1]))
+    block_offsets = np.flatnonzero(is_new_block)
+
+    # Merge exons within each block to identify continuous blocks
+    block_starts = exon_starts[block_offsets]
+    block_ends = np.maximum.reduceat(exon_ends, block_offsets)
+
+    # Compute gap start and end positions between consecutive blocks
+    gap_starts = block_ends[:-1] + 1
+    gap_ends = block_starts[1:] - 1
+
+    # Keep valid gaps where the gap start is less than or equal to the gap end
+    is_valid_gap = gap_starts <= gap_ends
+    gaps = pl.DataFrame({
+        "start": gap_starts[is_valid_gap],
+        "end": gap_ends[is_valid_gap]
+    })
 
     return gaps
 
@@ -315,23 +303,23 @@ def _get_tx_start_gaps(exons: pl.DataFrame, transcript_id_column: str) -> pl.Dat
     - The function calculates the gap between the overall start of the first exon across all transcripts and the start of each individual transcript's first exon.
     - It assumes that all exons are on the same chromosome and strand.
     """
-    # Get the start of the first exon for each transcript (grouped by transcript_id_column)
-    tx_starts = exons.group_by(transcript_id_column).agg(pl.col('start').min())
-
-    # Get the overall start of the first exon across all transcripts
-    overall_start = exons['start'].min()
-
-    # Use the same chromosome and strand for all transcripts
-    seqnames_value = exons['seqnames'][0]
-    strand_value = exons['strand'][0]
-
-    # Create tx_start_gaps DataFrame with gap information
-    tx_start_gaps = tx_starts.with_columns([
-        pl.col('start').cast(pl.Int64).alias('end'),
-        pl.lit(overall_start).cast(pl.Int64).alias('start'),
-        pl.lit(seqnames_value).alias('seqnames'),
-        pl.lit(strand_value).alias('strand'),
-    ])
+    # Get the start of the first exon for each transcript (grouped by transcript_id_column) in a single
+    # aggregation, taking the chromosome and strand along (all exons share them)
+    tx_starts = exons.group_by(transcript_id_column).agg(
+        pl.col('start').min().cast(pl.Int64).alias('end'),
+        pl.col('seqnames').first(),
+        pl.col('strand').first()
+    )
+
+    # Create tx_start_gaps DataFrame with gap information, where every gap begins at the overall start
+    # of the first exon across all transcripts
+    tx_start_gaps = tx_starts.select(
+        pl.col(transcript_id_column),
+        pl.col('end').min().alias('start'),
+        pl.col('end'),
+        pl.col('seqnames'),
+        pl.col('strand')
+    )
 
     return tx_start_gaps
 
@@ -360,44 +348,51 @@ def _get_gap_map(df: pl.DataFrame, gaps: pl.DataFrame) -> dict:
     
     Notes
     -----
-    - The function first identifies gaps that exactly match the start and end positions of exons or introns.
-    - It then identifies gaps that are fully contained within exons or introns but do not exactly match them.
+    - The function first identifies gaps that are fully contained within exons or introns, using binary searches on the gap coordinates.
+    - Contained gaps that exactly match the start and end positions of exons or introns are reported as 'equal', the others as 'pure_within'.
+    - `gaps` must be sorted by start position and non-overlapping, as returned by `_get_gaps`.
     - These mappings are used to determine how gaps should be shortened or adjusted.
     """
-    # Add an index to each gap and exon/intron row
-    gaps = gaps.with_row_count("gap_index")
-    df = df.with_row_count("df_index")
-    
-    # Find gaps where the start and end positions exactly match those of df (exons/introns)
-    equal_hits = gaps.join(df, how="inner", 
-                           left_on=["start", "end"], 
-                           right_on=["start", "end"]).select([
-                               pl.col("gap_index"), 
-                               pl.col("df_index")
-                           ])
-    
-    # Rename columns for clarity when performing the cross join
-    gaps = gaps.rename({
-        "start": "gaps.start",
-        "end": "gaps.end"
+    # Pull the coordinates out as NumPy arrays
+    gap_starts = gaps["start"].to_numpy()
+    gap_ends = gaps["end"].to_numpy()
+    df_starts = df["start"].to_numpy()
+    df_ends = df["end"].to_numpy()
+
+    # Gaps are sorted and do not overlap, so the gaps contained in each exon/intron form a contiguous run
+    # that can be located with two binary searches instead of comparing every gap with every row
+    first_gap = np.searchsorted(gap_starts, df_starts, side="left")
+    last_gap = np.searchsorted(gap_ends, df_ends, side="right")
+    hit_counts = np.maximum(last_gap - first_gap, 0)
+
+    # Expand the runs into (gap_index, df_index) pairs of gaps fully contained within exons/introns
+    df_index = np.repeat(np.arange(len(df_starts)), hit_counts)
+    run_offsets = np.arange(len(df_index)) - np.repeat(np.cumsum(hit_counts) - hit_counts, hit_counts)
+    gap_index = np.repeat(first_gap, hit_counts) + run_offsets
+
+    # Row positions fit in 32 bits (Polars row indexes are UInt32), so the pairs are kept as compact
+    # uint32 arrays that are sorted and handed to Polars without further casts
+    gap_index = gap_index.astype(np.uint32)
+    df_index = df_index.astype(np.uint32)
+
+    # Sort the pairs by gap and df index for further processing
+    pair_order = np.lexsort((df_index, gap_index))
+    gap_index = gap_index[pair_order]
+    df_index = df_index[pair_order]
+
+    # Contained gaps whose start and end positions exactly match those of df (exons/introns) are 'equal' hits,
+    # the remaining ones are 'pure_within' hits
+    is_equal = (gap_starts[gap_index] == df_starts[df_index]) & (gap_ends[gap_index] == df_ends[df_index])
+
+    equal_hits = pl.DataFrame({
+        "gap_index": gap_index[is_equal],
+        "df_index": df_index[is_equal]
     })
 
-    df = df.rename({
-        "start": "df.start",
-        "end": "df.end"
+    pure_within_hits = pl.DataFrame({
+        "gap_index": gap_index[~is_equal],
+        "df_index": df_index[~is_equal]
     })
-    
-    # Find gaps that are fully contained within exons/introns
-    within_hits = gaps.join(df, how="cross").filter(
-        (pl.col("gaps.start") >= pl.col("df.start")) & 
-        (pl.col("gaps.end") <= pl.col("df.end"))
-    ).select([pl.col("gap_index"), pl.col("df_index")])
-    
-    # Remove within_hits that also appear in equal_hits (to avoid duplication)
-    pure_within_hits = within_hits.join(equal_hits, how="anti", on=["df_index", "gap_index"])
-
-    # Sort the equal_hits by gap and df index for further processing
-    equal_hits = equal_hits.sort(["gap_index", "df_index"])
 
     # Return both the equal and pure_within mappings as a dictionary
     return {
@@ -443,90 +438,47 @@ def _get_shortened_gaps(df: pl.DataFrame, gaps: pl.DataFrame, gap_map: dict,
     - Gaps classified as 'equal' and exceeding the target width are shortened to match the target.
     - Gaps classified as 'pure_within' are adjusted based on the target width, ensuring they do not exceed the defined maximum.
     - The function updates the 'width' of each gap accordingly and removes unnecessary columns post-adjustment.
+    - If no gap lies within any exon or intron, the full widths are returned and no 'equal' gap is shortened either.
     """
-    # Calculate the width of exons/introns and initialize a 'shorten_type' column
-    df =  df.with_columns(
-        (pl.col('end') - pl.col('start') + 1).alias('width'),  # Calculate the width
-        pl.lit('none').alias('shorten_type')  # Initialize shorten_type column
-    )
+    # Without any gap lying within an exon/intron the widths are returned as they are, so the
+    # gap classification below is skipped entirely
+    if 'pure_within' not in gap_map or gap_map['pure_within'].height == 0:
+        return df.with_columns(
+            (pl.col('end') - pl.col('start') + 1).alias('width')  # Calculate the width
+        )
 
-    # Add an index column to the df DataFrame
-    df = df.with_row_count(name="df_index")
+    # Calculate the width of exons/introns
+    width = (df['end'] - df['start'] + 1).to_numpy()
 
-    # Update 'shorten_type' for gaps that exactly match exons/introns
+    # Flag exons/introns by how they relate to the gaps as int8 codes written by row position: 0 for no
+    # matching or contained gap, 1 for a gap that exactly matches ('equal') and 2 for gaps fully within
+    # ('pure_within', which takes precedence over 'equal')
+    shorten_code = np.zeros(df.height, dtype=np.int8)
     if 'equal' in gap_map and 'df_index' in gap_map['equal'].columns:
-        df = df.with_columns(
-            pl.when(pl.col("df_index").is_in(gap_map["equal"]["df_index"]))
-            .then(pl.lit("equal"))
-            .otherwise(pl.col("shorten_type"))
-            .alias("shorten_type")
-        )
-
-    # Update 'shorten_type' for gaps fully within exons/introns
-    if 'pure_within' in gap_map and 'df_index' in gap_map['pure_within'].columns:
-        df = df.with_columns(
-            pl.when(pl.col("df_index").is_in(gap_map['pure_within']['df_index']))
-            .then(pl.lit("pure_within"))
-            .otherwise(pl.col("shorten_type"))
-            .alias("shorten_type")
-        )
+        shorten_code[gap_map['equal']['df_index'].to_numpy()] = 1
+    shorten_code[gap_map['pure_within']['df_index'].to_numpy()] = 2
 
     # Shorten gaps that are of type 'equal' and have a width greater than the target_gap_width
-    df = df.with_columns(
-        pl.when((pl.col('shorten_type') == 'equal') & (pl.col('width') > target_gap_width))
-        .then(pl.lit(target_gap_width))
-        .otherwise(pl.col('width'))
-        .alias('shortened_width')
-    )
+    shortened_width = np.where((shorten_code == 1) & (width > target_gap_width), target_gap_width, width)
 
     # Handle gaps that are 'pure_within'
-    if 'pure_within' in gap_map and len(gap_map['pure_within']) > 0:
-        overlapping_gap_indexes = gap_map['pure_within']['gap_index']
-        gaps = gaps.with_row_count(name="gap_index")
-
-        if len(overlapping_gap_indexes) > 0:
-            sum_gap_diff = pl.DataFrame({
-                'intron_indexes': gap_map['pure_within']['df_index'],
-                'gap_width': gaps.join(overlapping_gap_indexes.to_frame("gap_index"), on="gap_index", how="inner")
-                                .with_columns((pl.col('end') - pl.col('start') + 1).alias('gap_width'))
-                                .select('gap_width')
-                                .to_series()
-            })
-
-            # Shorten gap width if larger than target_gap_width
-            sum_gap_diff = sum_gap_diff.with_columns(
-                pl.when(pl.col('gap_width') > target_gap_width)
-                .then(pl.lit(target_gap_width))
-                .otherwise(pl.col('gap_width'))
-                .alias('shortened_gap_width')
-            )
-
-            # Calculate the gap difference
-            sum_gap_diff = sum_gap_diff.with_columns(
-                (pl.col('gap_width') - pl.col('shortened_gap_width')).alias('shortened_gap_diff')
-            )
-
-            # Aggregate gap differences by intron indexes
-            sum_gap_diff = sum_gap_diff.group_by('intron_indexes').agg(
-                pl.sum('shortened_gap_diff').alias('sum_shortened_gap_diff')
-            )
-
-            # Join the calculated gap differences with the df DataFrame
-            df = df.join(sum_gap_diff, left_on='df_index', right_on='intron_indexes', how='left')
-
-            # Adjust the width based on gap differences
-            df = df.with_columns(
-                pl.when(pl.col('sum_shortened_gap_diff').is_null())
-                  .then(pl.col('shortened_width'))
-                  .otherwise(pl.col('width') - pl.col('sum_shortened_gap_diff'))
-                  .alias('shortened_width')
-            )
-
-            # Clean up unnecessary columns
-            df = df.drop(['sum_shortened_gap_diff', 'shorten_type', 'width'])
-            df = df.rename({'shortened_width': 'width'})
-
-        df = df.drop('df_index')
+    overlapping_gap_indexes = gap_map['pure_within']['gap_index'].to_numpy()
+    intron_indexes = gap_map['pure_within']['df_index'].to_numpy()
+
+    # Width of each gap that lies within an exon/intron, looked up by position
+    gap_widths = (gaps['end'] - gaps['start'] + 1).to_numpy()[overlapping_gap_indexes]
+
+    # Shorten gap width if larger than target_gap_width and calculate the gap difference
+    shortened_gap_diff = gap_widths - np.minimum(gap_widths, target_gap_width)
+
+    # Sum gap differences per exon/intron in a single pass (zero for rows without contained gaps)
+    sum_shortened_gap_diff = np.bincount(intron_indexes, weights=shortened_gap_diff, minlength=df.height)
+
+    # Adjust the width based on gap differences. Rows containing gaps never match a gap exactly, so
+    # their shortened width is still their full width.
+    df = df.with_columns(
+        pl.Series('width', shortened_width - sum_shortened_gap_diff.astype(width.dtype))
+    )
 
     return df
 
@@ -571,9 +523,6 @@ def _get_rescaled_txs(
     - It adjusts intron positions to prevent overlap with exons.
     - Transcript start gaps are incorporated to ensure accurate rescaling across different transcripts.
     """
-    # Clone exons to avoid altering the original DataFrame
-    exons = exons.clone()
-
     # Define columns to keep for introns, including 'width'
     column_to_keep = exons.columns + ["width"]
 
@@ -588,6 +537,17 @@ def _get_rescaled_txs(
     # Concatenate exons and shortened introns into a single DataFrame
     rescaled_tx = pl.concat([exons, introns_shortened], how='vertical')
 
+    # If no transcript_id_column, set all transcripts to start at position 1
+    if not transcript_id_column:
+        rescaled_tx = rescaled_tx.with_columns(
+            pl.lit(1).alias('width_tx_start')
+        )
+    else:
+        # Join rescaled transcript start gaps to adjust start positions
+        rescaled_tx = rescaled_tx.join(
+            tx_start_gaps_shortened, on=transcript_id_column, how='left', suffix='_tx_start'
+        )
+
     # Sort the DataFrame by transcript_id_column (e.g., 'transcript_id') and start position
     if transcript_id_column:
         if isinstance(transcript_id_column, list):
@@ -598,65 +558,28 @@ def _get_rescaled_txs(
         sort_columns = ['start', 'end']
     rescaled_tx = rescaled_tx.sort(sort_columns)
 
-    # Calculate cumulative sum for rescaled end positions
+    # Calculate cumulative sum of widths within each transcript for rescaled end positions
+    cumulative_width = pl.col('width').cum_sum()
     if transcript_id_column:
-        rescaled_tx = rescaled_tx.with_columns(
-            pl.col('width').cum_sum().over(transcript_id_column).alias('rescaled_end')
-        )
-    else:
-        rescaled_tx = rescaled_tx.with_columns(
-            pl.col('width').cum_sum().alias('rescaled_end')
-        )
-    
-    # Compute the rescaled start positions based on the cumulative end positions
-    rescaled_tx = rescaled_tx.with_columns(
-        (pl.col('rescaled_end') - pl.col('width') + 1).alias('rescaled_start')
-    )
+        cumulative_width = cumulative_width.over(transcript_id_column)
 
-    # If no transcript_id_column, set all transcripts to start at position 1
-    if not transcript_id_column:
-        rescaled_tx = rescaled_tx.with_columns(
-            pl.lit(1).alias('width_tx_start')
-        )
-    else:
-        # Join rescaled transcript start gaps to adjust start positions
-        rescaled_tx = rescaled_tx.join(
-            tx_start_gaps_shortened, on=transcript_id_column, how='left', suffix='_tx_start'
-        )
-    
-    # Adjust the rescaled start and end positions based on transcript start gaps
-    rescaled_tx = rescaled_tx.with_columns([
-        (pl.col('rescaled_end') + pl.col('width_tx_start')).alias('rescaled_end'),
-        (pl.col('rescaled_start') + pl.col('width_tx_start')).alias('rescaled_start')
-    ])
+    # Intron start and end positions are adjusted to avoid overlap with exons, using a single 0/1 offset
+    # so the intron mask is evaluated once
+    intron_offset = (pl.col('type') == 'intron').cast(pl.Int8)
 
-    # Adjust intron start and end positions to avoid overlap with exons
+    # Compute the rescaled start and end positions, shifted by the transcript start gaps, and adjust intron
+    # positions, all in a single pass
     rescaled_tx = rescaled_tx.with_columns([
-        pl.when(pl.col('type') == 'intron')
-          .then(pl.col('start') - 1)
-          .otherwise(pl.col('start'))
-          .alias('start'),
-        pl.when(pl.col('type') == 'intron')
-          .then(pl.col('end') + 1)
-          .otherwise(pl.col('end'))
-          .alias('end'),
-        pl.when(pl.col('type') == 'intron')
-          .then(pl.col('rescaled_start') - 1)
-          .otherwise(pl.col('rescaled_start'))
-          .alias('rescaled_start'),
-        pl.when(pl.col('type') == 'intron')
-          .then(pl.col('rescaled_end') + 1)
-          .otherwise(pl.col('rescaled_end'))
-          .alias('rescaled_end')
+        (pl.col('start') - intron_offset).alias('start'),
+        (pl.col('end') + intron_offset).alias('end'),
+        (cumulative_width - pl.col('width') + 1 + pl.col('width_tx_start') - intron_offset).alias('rescaled_start'),
+        (cumulative_width + pl.col('width_tx_start') + intron_offset).alias('rescaled_end')
     ])
     
-    # Drop 'width' column
-    rescaled_tx = rescaled_tx.drop(['width'])
-    
-    # Reorder columns for consistency in the output
+    # Reorder columns for consistency in the output, dropping the 'width' column
     columns = rescaled_tx.columns
     column_order = ['seqnames', 'start', 'end', "rescaled_start", "rescaled_end", 'strand'] + [
-        col for col in columns if col not in ['seqnames', 'start', 'end', "rescaled_start", "rescaled_end", 'strand']
+        col for col in columns if col not in ['seqnames', 'start', 'end', "rescaled_start", "rescaled_end", 'strand', 'width']
     ]
     rescaled_tx = rescaled_tx.select(column_order)
     
@@ -715,13 +638,9 @@ def _get_cds_exon_difference(gene_exons: pl.DataFrame, gene_cds_regions: pl.Data
     # Perform left join between CDS and exon data on the common columns
     cds_exon_diff = cds_regions.join(exons, on=common_columns, how='left')
     
-    # Calculate absolute differences between exon and CDS start positions
-    cds_exon_diff = cds_exon_diff.with_columns(
-        (pl.col('exon_start') - pl.col('cds_start')).abs().alias('diff_start')
-    )
-    
-    # Calculate absolute differences between exon and CDS end positions
+    # Calculate absolute differences between exon and CDS start and end positions
     cds_exon_diff = cds_exon_diff.with_columns(
+        (pl.col('exon_start') - pl.col('cds_start')).abs().alias('diff_start'),
         (pl.col('exon_end') - pl.col('cds_end')).abs().alias('diff_end')
     )
     
@@ -782,19 +701,15 @@ def _get_rescale_cds(cds_exon_diff: pl.DataFrame, gene_rescaled_exons: pl.DataFr
     # Perform left join on common columns
     gene_rescaled_cds = cds_prepared.join(exons_prepared, on=common_columns, how='left')
 
-    # Adjust start and end positions of CDS based on exon positions
-    gene_rescaled_cds = gene_rescaled_cds.with_columns([
+    # In a single select, rename cds start and cds end to start and end, drop the columns used for the
+    # difference calculations and adjust start and end positions of CDS based on exon positions
+    renamed_columns = {"cds_start": "start", "cds_end": "end"}
+    dropped_columns = ['exon_start', 'exon_end', 'diff_start', 'diff_end']
+    gene_rescaled_cds = gene_rescaled_cds.select(
+        *[pl.col(col).alias(renamed_columns.get(col, col))
+          for col in gene_rescaled_cds.columns if col not in dropped_columns],
         (pl.col('exon_start') + pl.col('diff_start')).alias('rescaled_start'),
         (pl.col('exon_end') - pl.col('diff_end')).alias('rescaled_end')
-    ])
-
-    # Drop unnecessary columns used for the difference calculations
-    gene_rescaled_cds = gene_rescaled_cds.drop(['exon_start', 'exon_end', 'diff_start', 'diff_end'])
-
-    # Rename cds start and cds end to start and end
-    gene_rescaled_cds = gene_rescaled_cds.rename({
-        "cds_start": "start",
-        "cds_end": "end"
-    })
+    )
 
     return gene_rescaled_cds